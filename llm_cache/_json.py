@@ -0,0 +1,68 @@
+"""JSON encoding helpers, using orjson when it is installed."""
+
+import json
+import math
+import re
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Long enough to be an integer that does not fit in 64 bits
+_LONG_DIGITS = re.compile(rb"\d{20}")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """Serialize with the stdlib in the same compact UTF-8 form as orjson."""
+    try:
+        data = json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+        )
+    except ValueError:
+        # orjson writes NaN and infinities as null; do the same
+        data = json.dumps(
+            _finite(obj), ensure_ascii=False, separators=(",", ":")
+        )
+    return data.encode()
+
+
+def _finite(obj: Any) -> Any:
+    """Copy obj with NaN and infinite floats replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(item) for item in obj]
+    return obj
+
+
+if ORJSON_AVAILABLE:
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Values orjson refuses but json accepts, e.g. ints over 64 bits
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str."""
+        # orjson reads integers beyond 64 bits as floats
+        if _LONG_DIGITS.search(data if isinstance(data, bytes) else data.encode()):
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity, as written by older stdlib-encoded entries
+            return json.loads(data)
+
+else:
+    dumps = _stdlib_dumps
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON from bytes or str."""
+        return json.loads(data)
@@ -1,11 +1,91 @@
 """SQLite-based cache for LLM responses."""
 
-import json
+import atexit
+import os
+import queue
 import sqlite3
+import tempfile
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import _json
+
+# Applied to every connection; these settings do not persist in the database file
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Column layout of the cache table
+_CACHE_SCHEMA = """(
+    key TEXT PRIMARY KEY,
+    response BLOB NOT NULL,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    hit_count INTEGER DEFAULT 0,
+    last_accessed REAL NOT NULL
+) WITHOUT ROWID"""
+
+# Hot-path statements. Each is defined once and reused verbatim so the
+# connection's prepared statement cache (keyed by SQL text) always hits.
+_SQL_GET = """
+    UPDATE cache
+    SET hit_count = hit_count + 1, last_accessed = ?
+    WHERE key = ? AND (expires_at IS NULL OR expires_at >= ?)
+    RETURNING response, expires_at
+"""
+_SQL_DELETE_EXPIRED = "DELETE FROM cache WHERE key = ? AND expires_at < ?"
+_SQL_SET = """
+    INSERT OR REPLACE INTO cache
+    (key, response, model, created_at, expires_at, hit_count, last_accessed)
+    VALUES (?, ?, ?, ?, ?, 0, ?)
+"""
+_SQL_TOUCH = """
+    UPDATE cache
+    SET hit_count = hit_count + ?, last_accessed = MAX(last_accessed, ?)
+    WHERE key = ?
+"""
+_SQL_ADD_STAT = """
+    INSERT INTO stats (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = value + excluded.value
+"""
+_SQL_EVICT = """
+    DELETE FROM cache WHERE key IN (
+        SELECT key FROM cache
+        ORDER BY last_accessed DESC
+        LIMIT -1 OFFSET ?
+    )
+    RETURNING key
+"""
+_SQL_DELETE = "DELETE FROM cache WHERE key = ?"
+_SQL_STATS = """
+    WITH m AS (SELECT model, COUNT(*) AS n FROM cache GROUP BY model)
+    SELECT
+        (SELECT value FROM stats WHERE key = 'hits'),
+        (SELECT value FROM stats WHERE key = 'misses'),
+        (SELECT COALESCE(SUM(n), 0) FROM m),
+        (SELECT json_group_object(model, n) FROM m)
+"""
+
+# Maximum age of unflushed hit/miss counts before get() writes them out
+_STATS_FLUSH_INTERVAL = 5.0
+
+# Most queued writes the background writer commits in one transaction
+_WRITE_BATCH_SIZE = 64
+
+# Seconds the background writer waits for more work before exiting
+_WRITER_IDLE_TIMEOUT = 1.0
 
 
 @dataclass
@@ -27,6 +107,7 @@ class Cache:
     - Content-addressable storage (hash-based keys)
     - TTL support
     - Size limits with LRU eviction
+    - In-process LRU of hot entries in front of SQLite
     - Hit/miss statistics
     """
 
@@ -35,6 +116,7 @@ class Cache:
         path: Optional[Path] = None,
         ttl_seconds: Optional[int] = None,
         max_entries: Optional[int] = None,
+        memory_entries: int = 1024,
     ):
         """
         Initialize the cache.
@@ -43,6 +125,11 @@ class Cache:
             path: Path to SQLite database. Defaults to ~/.llm-cache/cache.db
             ttl_seconds: Default TTL for entries. None means no expiration.
             max_entries: Maximum number of entries. None means unlimited.
+                Eviction runs every few writes, so the cache may briefly
+                exceed this by a small margin.
+            memory_entries: Number of recently read entries kept in process
+                memory. 0 disables the in-memory layer. Writes made by other
+                processes are not seen for keys already held in memory.
         """
         if path is None:
             path = Path.home() / ".llm-cache" / "cache.db"
@@ -53,22 +140,149 @@ class Cache:
         self.ttl_seconds = ttl_seconds
         self.max_entries = max_entries
 
+        # One long-lived connection per thread (e.g. Flask worker threads)
+        self._local = threading.local()
+
+        # Hit/miss counts accumulated in memory and flushed in batches
+        self._stats_lock = threading.Lock()
+        self._pending_hits = 0
+        self._pending_misses = 0
+        self._last_stats_flush = time.monotonic()
+
+        # Hot entries: key -> (response blob, expires_at), most recent last
+        self._mem: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._mem_cap = memory_entries
+        self._mem_lock = threading.Lock()
+        # Bumped whenever entries are dropped from memory, so a row read from
+        # SQLite before the drop is not put back (guarded by _mem_lock)
+        self._mem_generation = 0
+        # Reads served from memory, written back to SQLite with the stats:
+        # key -> (extra hit count, last access time)
+        self._pending_touches: Dict[str, Tuple[int, float]] = {}
+
+        # Writes since the last LRU eviction pass; races only shift its timing
+        self._sets_since_evict = 0
+
+        # Write-behind queue of _SQL_SET rows, committed in batches by a
+        # background thread that is started on demand
+        self._write_q: "queue.Queue[tuple]" = queue.Queue()
+        self._writer_lock = threading.Lock()
+        self._writer_thread: Optional[threading.Thread] = None
+        # Queued rows not yet committed, so reads see them immediately
+        # (guarded by _mem_lock): key -> row
+        self._pending_writes: Dict[str, tuple] = {}
+        # First error a background write hit, raised by the next flush()
+        self._write_error: Optional[BaseException] = None
+
         self._init_db()
 
+        # Per-instance, so close() can unregister it; holds only a weakref
+        self._atexit = partial(_flush_at_exit, weakref.ref(self))
+        atexit.register(self._atexit)
+        # Fork hooks can't be unregistered: one stays behind per Cache
+        # created, and is a no-op once the Cache has been collected
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(
+                after_in_child=partial(_reset_in_child, weakref.ref(self))
+            )
+
+    def _reset_after_fork(self):
+        """
+        Give a forked child fresh locks and an empty write queue.
+
+        The writer thread does not survive fork(), and locks may have been
+        held by other parent threads. Queued rows and pending counts are
+        dropped rather than kept: the parent still owns and writes them, so
+        the child writing them too would commit them twice.
+        """
+        self._stats_lock = threading.Lock()
+        self._pending_hits = self._pending_misses = 0
+        self._pending_touches = {}
+        self._mem_lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+        self._write_q = queue.Queue()
+        self._writer_thread = None
+        self._pending_writes = {}
+        self._write_error = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+
+        The connection runs in autocommit mode; use _transaction() to group
+        several statements into a single commit.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid != os.getpid():
+            # Inherited across fork(); SQLite connections must not be reused
+            # there, and closing it could disturb the parent's locks
+            conn = None
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed statements in one write transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def flush(self):
+        """
+        Wait for queued writes to be committed and write out pending stats.
+
+        Raises:
+            The first exception a background write hit since the last flush.
+            Only the rows that caused it were lost.
+        """
+        self._drain()
+        with self._writer_lock:
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def _drain(self):
+        """Like flush(), but leaves any background write error for flush()."""
+        self._write_q.join()
+        self._flush_stats()
+
+    def close(self):
+        """Flush, then close the calling thread's database connection, if open."""
+        atexit.unregister(self._atexit)
+        try:
+            self.flush()
+        finally:
+            self._close_connection()
+
+    def _close_connection(self):
+        """Close the calling thread's database connection, if open."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def _init_db(self):
         """Initialize the database schema."""
-        with sqlite3.connect(self.path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS cache (
-                    key TEXT PRIMARY KEY,
-                    response TEXT NOT NULL,
-                    model TEXT NOT NULL,
-                    created_at REAL NOT NULL,
-                    expires_at REAL,
-                    hit_count INTEGER DEFAULT 0,
-                    last_accessed REAL NOT NULL
-                )
-            """)
+        conn = self._connect()
+        # WAL persists in the database file, so it only needs setting once
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as conn:
+            # WITHOUT ROWID stores each row inside the primary key B-tree,
+            # so a lookup by key is a single descent
+            conn.execute(f"CREATE TABLE IF NOT EXISTS cache {_CACHE_SCHEMA}")
+            self._migrate_without_rowid(conn)
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
             """)
@@ -83,13 +297,29 @@ class Cache:
                     value INTEGER DEFAULT 0
                 )
             """)
-            conn.execute("""
-                INSERT OR IGNORE INTO stats (key, value) VALUES ('hits', 0)
-            """)
-            conn.execute("""
-                INSERT OR IGNORE INTO stats (key, value) VALUES ('misses', 0)
-            """)
-            conn.commit()
+
+        # Don't keep the constructing thread's connection around: a process
+        # forked after __init__ (e.g. gunicorn --preload) must not inherit it
+        self._close_connection()
+
+    def _migrate_without_rowid(self, conn: sqlite3.Connection):
+        """Rebuild a cache table created before it became WITHOUT ROWID."""
+        (sql,) = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+        ).fetchone()
+        if "WITHOUT ROWID" in sql.upper():
+            return
+
+        conn.execute(f"CREATE TABLE cache_new {_CACHE_SCHEMA}")
+        conn.execute("""
+            INSERT INTO cache_new
+            (key, response, model, created_at, expires_at, hit_count, last_accessed)
+            SELECT key, response, model, created_at, expires_at, hit_count, last_accessed
+            FROM cache
+        """)
+        # Dropping the table also drops its indexes; they are recreated below
+        conn.execute("DROP TABLE cache")
+        conn.execute("ALTER TABLE cache_new RENAME TO cache")
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -101,53 +331,121 @@ class Cache:
         Returns:
             Cached response dict or None if not found/expired
         """
-        now = time.time()
+        blob = self.get_raw(key)
+        return _json.loads(blob) if blob is not None else None
 
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.execute(
-                """
-                SELECT response, expires_at FROM cache
-                WHERE key = ?
-                """,
-                (key,)
-            )
-            row = cursor.fetchone()
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached response as its stored JSON bytes, without parsing.
 
-            if row is None:
-                # Cache miss
-                conn.execute(
-                    "UPDATE stats SET value = value + 1 WHERE key = 'misses'"
-                )
-                conn.commit()
-                return None
+        Args:
+            key: Cache key (hash)
+
+        Returns:
+            Cached response body or None if not found/expired
+        """
+        now = time.time()
 
-            response_json, expires_at = row
+        if self._mem_cap:
+            with self._mem_lock:
+                cached = self._mem.get(key)
+                if cached is not None:
+                    blob, expires_at = cached
+                    if expires_at is None or expires_at >= now:
+                        self._mem.move_to_end(key)
+                    else:
+                        del self._mem[key]
+                        cached = None
+            if cached is not None:
+                self._record(hit=True, key=key, now=now)
+                return blob
+
+        # Written through this cache but not yet committed
+        with self._mem_lock:
+            pending = self._pending_writes.get(key)
+            generation = self._mem_generation
+        if pending is not None:
+            _, blob, _, _, expires_at, _ = pending
+            if expires_at is None or expires_at >= now:
+                self._record(hit=True, key=key, now=now)
+                return blob
+
+        conn = self._connect()
+        # Touch and read a live entry in one statement
+        cursor = conn.execute(_SQL_GET, (now, key, now))
+        row = cursor.fetchone()
+
+        if row is None:
+            # Cache miss - drop the entry if it exists but has expired
+            conn.execute(_SQL_DELETE_EXPIRED, (key, now))
+            self._record(hit=False)
+            return None
+
+        self._record(hit=True)
+
+        blob, expires_at = row
+        if isinstance(blob, str):
+            # Row written before responses were stored as BLOBs
+            blob = blob.encode()
+        if self._mem_cap:
+            with self._mem_lock:
+                # Skip if a write or delete may have overtaken this read
+                if self._mem_generation == generation:
+                    self._mem[key] = (blob, expires_at)
+                    self._mem.move_to_end(key)
+                    if len(self._mem) > self._mem_cap:
+                        self._mem.popitem(last=False)
+
+        return blob
+
+    def _forget(self, keys: Iterable[str]):
+        """Drop keys from the in-memory layer."""
+        with self._mem_lock:
+            self._mem_generation += 1
+            for key in keys:
+                self._mem.pop(key, None)
+
+    def _record(
+        self, hit: bool, key: Optional[str] = None, now: Optional[float] = None
+    ):
+        """
+        Count a hit or miss, flushing to the database periodically.
 
-            # Check expiration
-            if expires_at is not None and expires_at < now:
-                # Expired, delete and return miss
-                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
-                conn.execute(
-                    "UPDATE stats SET value = value + 1 WHERE key = 'misses'"
-                )
-                conn.commit()
-                return None
-
-            # Cache hit - update stats
-            conn.execute(
-                """
-                UPDATE cache
-                SET hit_count = hit_count + 1, last_accessed = ?
-                WHERE key = ?
-                """,
-                (now, key)
-            )
-            conn.execute(
-                "UPDATE stats SET value = value + 1 WHERE key = 'hits'"
+        Passing key and now records a hit served without touching SQLite,
+        whose hit_count and last_accessed still need writing back.
+        """
+        with self._stats_lock:
+            if hit:
+                self._pending_hits += 1
+            else:
+                self._pending_misses += 1
+            if key is not None:
+                count, _ = self._pending_touches.get(key, (0, now))
+                self._pending_touches[key] = (count + 1, now)
+            due = time.monotonic() - self._last_stats_flush >= _STATS_FLUSH_INTERVAL
+
+        if due:
+            self._flush_stats()
+
+    def _flush_stats(self):
+        """Write accumulated hit/miss counts to the stats table."""
+        with self._stats_lock:
+            hits, misses = self._pending_hits, self._pending_misses
+            touches = self._pending_touches
+            self._pending_hits = self._pending_misses = 0
+            self._pending_touches = {}
+            self._last_stats_flush = time.monotonic()
+
+        if not hits and not misses:
+            return
+
+        with self._transaction() as conn:
+            conn.executemany(
+                _SQL_TOUCH,
+                [(count, accessed, key) for key, (count, accessed) in touches.items()]
             )
-            conn.commit()
-
-            return json.loads(response_json)
+            conn.execute(_SQL_ADD_STAT, ("hits", hits))
+            conn.execute(_SQL_ADD_STAT, ("misses", misses))
 
     def set(
         self,
@@ -165,45 +463,159 @@ class Cache:
             model: Model name
             ttl_seconds: TTL override. Uses default if None.
         """
+        self.set_raw(key, _json.dumps(response), model, ttl_seconds)
+
+    def set_raw(
+        self,
+        key: str,
+        blob: bytes,
+        model: str,
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Store an already-serialized JSON response unchanged.
+
+        Returns immediately: the entry is committed by a background writer
+        thread, batched with other pending writes. Reads through this Cache
+        see it right away; call flush() to wait for the commit.
+
+        Args:
+            key: Cache key (hash)
+            blob: Response body as JSON bytes
+            model: Model name
+            ttl_seconds: TTL override. Uses default if None.
+
+        Raises:
+            ValueError: If key, blob or model is None
+        """
+        # Checked here because a failed background write can't reach the caller
+        if key is None or blob is None or model is None:
+            raise ValueError("key, blob and model must not be None")
+
         now = time.time()
         ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
         expires_at = now + ttl if ttl is not None else None
 
-        with sqlite3.connect(self.path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO cache
-                (key, response, model, created_at, expires_at, hit_count, last_accessed)
-                VALUES (?, ?, ?, ?, ?, 0, ?)
-                """,
-                (key, json.dumps(response), model, now, expires_at, now)
-            )
-            conn.commit()
+        row = (key, blob, model, now, expires_at, now)
+        with self._mem_lock:
+            self._mem_generation += 1
+            self._mem.pop(key, None)
+            self._pending_writes[key] = row
+
+        with self._writer_lock:
+            self._write_q.put(row)
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._writer, name="llm-cache-writer", daemon=True
+                )
+                self._writer_thread.start()
+
+    def _writer(self):
+        """Commit queued writes in batches until the queue stays idle."""
+        while True:
+            try:
+                batch = [self._write_q.get(timeout=_WRITER_IDLE_TIMEOUT)]
+            except queue.Empty:
+                with self._writer_lock:
+                    if self._write_q.empty():
+                        self._writer_thread = None
+                        self._close_connection()
+                        return
+                continue
+
+            # Coalesce whatever else is already waiting
+            while len(batch) < _WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                try:
+                    self._insert_rows(batch)
+                except Exception:
+                    # Retry one by one so a bad row loses only itself
+                    for row in batch:
+                        try:
+                            self._insert_rows([row])
+                        except Exception as e:
+                            self._record_write_error(e)
+                self._after_write(len(batch))
+            except Exception as e:
+                self._record_write_error(e)
+            finally:
+                with self._mem_lock:
+                    for row in batch:
+                        if self._pending_writes.get(row[0]) is row:
+                            del self._pending_writes[row[0]]
+                for _ in batch:
+                    self._write_q.task_done()
+
+    def _record_write_error(self, error: BaseException):
+        """Keep the first background write error for flush() to raise."""
+        with self._writer_lock:
+            if self._write_error is None:
+                self._write_error = error
+
+    def set_many(
+        self,
+        entries: Iterable[Tuple[str, Dict[str, Any], str]],
+        ttl_seconds: Optional[int] = None,
+    ) -> int:
+        """
+        Store many responses in a single transaction.
 
-        # Enforce max entries if set
-        if self.max_entries:
+        Args:
+            entries: (key, response, model) tuples
+            ttl_seconds: TTL override applied to every entry. Uses default if None.
+
+        Returns:
+            Number of entries stored
+        """
+        now = time.time()
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = now + ttl if ttl is not None else None
+
+        rows = [
+            (key, _json.dumps(response), model, now, expires_at, now)
+            for key, response, model in entries
+        ]
+        if not rows:
+            return 0
+
+        # Queued single writes must not land on top of these later
+        self._write_q.join()
+        self._write_rows(rows)
+        return len(rows)
+
+    def _write_rows(self, rows: List[tuple]):
+        """Insert _SQL_SET rows in one transaction, then enforce max entries."""
+        self._insert_rows(rows)
+        self._after_write(len(rows))
+
+    def _insert_rows(self, rows: List[tuple]):
+        """Insert _SQL_SET rows in one transaction."""
+        with self._transaction() as conn:
+            conn.executemany(_SQL_SET, rows)
+        self._forget(row[0] for row in rows)
+
+    def _after_write(self, count: int):
+        """Enforce max entries if set, amortized over several writes."""
+        if not self.max_entries:
+            return
+
+        self._sets_since_evict += count
+        if self._sets_since_evict >= max(16, self.max_entries // 64):
+            self._sets_since_evict = 0
+            # Write back memory-served reads so hot entries are not evicted
+            self._flush_stats()
             self._evict_lru()
 
     def _evict_lru(self):
         """Evict least recently used entries if over limit."""
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM cache")
-            count = cursor.fetchone()[0]
-
-            if count > self.max_entries:
-                # Delete oldest entries
-                to_delete = count - self.max_entries
-                conn.execute(
-                    """
-                    DELETE FROM cache WHERE key IN (
-                        SELECT key FROM cache
-                        ORDER BY last_accessed ASC
-                        LIMIT ?
-                    )
-                    """,
-                    (to_delete,)
-                )
-                conn.commit()
+        # Keep the newest max_entries rows; one walk of idx_last_accessed
+        cursor = self._connect().execute(_SQL_EVICT, (self.max_entries,))
+        self._forget(key for (key,) in cursor.fetchall())
 
     def delete(self, key: str) -> bool:
         """
@@ -215,10 +627,11 @@ class Cache:
         Returns:
             True if entry was deleted, False if not found
         """
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.execute("DELETE FROM cache WHERE key = ?", (key,))
-            conn.commit()
-            return cursor.rowcount > 0
+        self._write_q.join()
+        conn = self._connect()
+        cursor = conn.execute(_SQL_DELETE, (key,))
+        self._forget((key,))
+        return cursor.rowcount > 0
 
     def clear(self, older_than_days: Optional[int] = None):
         """
@@ -227,7 +640,8 @@ class Cache:
         Args:
             older_than_days: Only clear entries older than this. None clears all.
         """
-        with sqlite3.connect(self.path) as conn:
+        self._write_q.join()
+        with self._transaction() as conn:
             if older_than_days is not None:
                 cutoff = time.time() - (older_than_days * 86400)
                 conn.execute("DELETE FROM cache WHERE created_at < ?", (cutoff,))
@@ -235,8 +649,14 @@ class Cache:
                 conn.execute("DELETE FROM cache")
 
             # Reset stats
+            with self._stats_lock:
+                self._pending_hits = self._pending_misses = 0
+                self._pending_touches = {}
             conn.execute("UPDATE stats SET value = 0")
-            conn.commit()
+
+        with self._mem_lock:
+            self._mem_generation += 1
+            self._mem.clear()
 
     def stats(self) -> Dict[str, Any]:
         """
@@ -245,26 +665,22 @@ class Cache:
         Returns:
             Dict with hits, misses, entries, size_bytes
         """
-        with sqlite3.connect(self.path) as conn:
-            # Get hit/miss counts
-            cursor = conn.execute("SELECT key, value FROM stats")
-            stats_dict = dict(cursor.fetchall())
-
-            # Get entry count
-            cursor = conn.execute("SELECT COUNT(*) FROM cache")
-            entry_count = cursor.fetchone()[0]
-
-            # Get models breakdown
-            cursor = conn.execute(
-                "SELECT model, COUNT(*) FROM cache GROUP BY model"
-            )
-            by_model = dict(cursor.fetchall())
-
-        # Get file size
-        size_bytes = self.path.stat().st_size if self.path.exists() else 0
+        self._drain()
+
+        # Hit/miss counts, entry count and models breakdown in one query
+        hits, misses, entry_count, by_model_json = self._connect().execute(
+            _SQL_STATS
+        ).fetchone()
+        hits = hits or 0
+        misses = misses or 0
+        by_model = _json.loads(by_model_json)
+
+        # Get file size, including recent writes still held in the WAL
+        size_bytes = 0
+        for file in (self.path, self.path.with_name(self.path.name + "-wal")):
+            if file.exists():
+                size_bytes += file.stat().st_size
 
-        hits = stats_dict.get("hits", 0)
-        misses = stats_dict.get("misses", 0)
         total = hits + misses
         hit_rate = hits / total if total > 0 else 0.0
 
@@ -279,12 +695,68 @@ class Cache:
             "path": str(self.path),
         }
 
+    def _checkpoint(self):
+        """Fold the WAL back into the main database file."""
+        conn = self._connect()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def export_db(self, output_path: Path):
         """Export the cache database to a file."""
-        import shutil
-        shutil.copy2(self.path, output_path)
+        self._drain()
+        # Online backup gives a consistent copy, including WAL contents
+        dst = sqlite3.connect(output_path)
+        try:
+            self._connect().backup(dst)
+        finally:
+            dst.close()
 
     def import_db(self, input_path: Path):
         """Import a cache database from a file."""
-        import shutil
-        shutil.copy2(input_path, self.path)
+        input_path = Path(input_path)
+        if not input_path.is_file():
+            raise FileNotFoundError(f"No cache database at {input_path}")
+
+        self._drain()
+        dst = self._connect()
+        (page_size,) = dst.execute("PRAGMA page_size").fetchone()
+        # Read-only, so a bad path can never create an empty source
+        src = sqlite3.connect(input_path.resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            if src.execute("PRAGMA page_size").fetchone()[0] == page_size:
+                src.backup(dst)
+            else:
+                # A backup can't change the page size of a WAL database, so
+                # copy the source at our page size first
+                with tempfile.TemporaryDirectory() as tmp:
+                    converted = Path(tmp) / "import.db"
+                    src.execute(f"PRAGMA page_size = {page_size:d}")
+                    src.execute("VACUUM INTO ?", (str(converted),))
+                    conv = sqlite3.connect(converted)
+                    try:
+                        conv.backup(dst)
+                    finally:
+                        conv.close()
+        finally:
+            src.close()
+        self._checkpoint()
+
+        # Bring an older export up to the current schema
+        self._init_db()
+
+        with self._mem_lock:
+            self._mem_generation += 1
+            self._mem.clear()
+
+
+def _flush_at_exit(ref: "weakref.ref[Cache]"):
+    """Flush queued writes and hit/miss counts of a live cache at interpreter exit."""
+    cache = ref()
+    if cache is not None:
+        cache.flush()
+
+
+def _reset_in_child(ref: "weakref.ref[Cache]"):
+    """Reset the background writer state of a live cache after fork()."""
+    cache = ref()
+    if cache is not None:
+        cache._reset_after_fork()
@@ -24,7 +24,8 @@ def cli():
 @click.option("--target-url", help="Target API URL (overrides provider default)")
 @click.option("--ttl", type=int, help="Default TTL in seconds")
 @click.option("--cache-path", type=click.Path(), help="Path to cache database")
-def serve(port, host, provider, target_url, ttl, cache_path):
+@click.option("--threads", type=int, default=32, help="Worker threads for concurrent requests")
+def serve(port, host, provider, target_url, ttl, cache_path, threads):
     """Start the cache proxy server."""
     try:
         from .proxy import CacheProxy
@@ -48,7 +49,7 @@ def serve(port, host, provider, target_url, ttl, cache_path):
     console.print(f"  OPENAI_BASE_URL=http://{host}:{port}/v1")
     console.print()
 
-    proxy.run(host=host, port=port)
+    proxy.run(host=host, port=port, threads=threads)
 
 
 @cli.command()
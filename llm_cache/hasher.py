@@ -1,26 +1,110 @@
 """Request hashing for cache keys."""
 
 import hashlib
-import json
 from typing import Any, Dict, List, Optional
 
+# Digest size in bytes; keys are hex strings of twice this length
+DIGEST_SIZE = 32
+
+# Message fields that take part in the cache key
+_REQUIRED_MESSAGE_KEYS = ("role", "content")
+_OPTIONAL_MESSAGE_KEYS = ("name", "tool_calls", "tool_call_id")
+
+# Message keys in sorted order, paired with their _canonical_update encoding
+_SORTED_MESSAGE_KEYS = tuple(
+    (key, b"s%d:%s" % (len(key), key.encode()))
+    for key in sorted(_REQUIRED_MESSAGE_KEYS + _OPTIONAL_MESSAGE_KEYS)
+)
+
+
+def _new_hasher():
+    """
+    Create an incremental hasher for cache keys.
+
+    Keys carry no security role, so BLAKE2b (faster than SHA-256) is used.
+    It is always the same stdlib algorithm, so keys match across installs.
+    """
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def _canonical_update(h, obj: Any):
+    """
+    Feed a JSON-like value into a hasher in canonical form.
+
+    Dict keys are visited in sorted order and every value is tagged with
+    its type (strings are also length-prefixed), so distinct structures
+    never produce the same byte stream. Nothing is materialized beyond
+    the encoded leaves.
+    """
+    if isinstance(obj, str):
+        data = obj.encode()
+        h.update(b"s%d:" % len(data))
+        h.update(data)
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key, value in sorted(obj.items()):
+            _canonical_update(h, key)
+            _canonical_update(h, value)
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _canonical_update(h, item)
+        h.update(b"]")
+    elif obj is None:
+        h.update(b"n")
+    elif obj is True:
+        h.update(b"t")
+    elif obj is False:
+        h.update(b"f")
+    elif isinstance(obj, int):
+        h.update(b"i%d;" % obj)
+    elif isinstance(obj, float):
+        h.update(b"d%s;" % repr(obj).encode())
+    else:
+        raise TypeError(
+            f"Object of type {type(obj).__name__} is not JSON serializable"
+        )
+
 
 def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Normalize messages for consistent hashing."""
-    normalized = []
-    for msg in messages:
-        norm_msg = {
+    return [
+        {
             "role": msg.get("role", ""),
             "content": msg.get("content", ""),
+            **{k: msg[k] for k in _OPTIONAL_MESSAGE_KEYS if k in msg},
         }
-        if "name" in msg:
-            norm_msg["name"] = msg["name"]
-        if "tool_calls" in msg:
-            norm_msg["tool_calls"] = msg["tool_calls"]
-        if "tool_call_id" in msg:
-            norm_msg["tool_call_id"] = msg["tool_call_id"]
-        normalized.append(norm_msg)
-    return normalized
+        for msg in messages
+    ]
+
+
+def _update_messages(h, messages: List[Dict[str, Any]]):
+    """
+    Feed messages into a hasher without building normalized copies.
+
+    Produces exactly the same stream as
+    _canonical_update(h, normalize_messages(messages)).
+    """
+    h.update(b"[")
+    for msg in messages:
+        # A str would pass the membership tests below as a substring search
+        if not isinstance(msg, dict):
+            raise TypeError(
+                f"Message must be a dict, not {type(msg).__name__}"
+            )
+        h.update(b"{")
+        for key, encoded_key in _SORTED_MESSAGE_KEYS:
+            if key in msg:
+                value = msg[key]
+            elif key in _REQUIRED_MESSAGE_KEYS:
+                value = ""
+            else:
+                continue
+            h.update(encoded_key)
+            _canonical_update(h, value)
+        h.update(b"}")
+    h.update(b"]")
 
 
 def hash_request(
@@ -43,32 +127,93 @@ def hash_request(
         **kwargs: Additional parameters to include in hash
 
     Returns:
-        SHA-256 hash string
+        Hex digest string (64 characters)
     """
-    # Build canonical request representation
-    request_data = {
-        "messages": normalize_messages(messages),
-        "model": model,
-    }
+    h = request_prefix_hasher(model, temperature, max_tokens, tools, **kwargs)
+    _update_messages(h, messages)
+    return h.hexdigest()
+
+
+def request_prefix_hasher(
+    model: str,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    tools: Optional[List[Dict]] = None,
+    **kwargs
+):
+    """
+    Hash every request parameter except the messages.
+
+    The canonical form is the parameter dict followed by the messages, so
+    the returned hasher can be copied and reused for many requests that
+    share parameters; hash_request feeds the messages into a fresh one.
+
+    Returns:
+        Incremental hasher (supports update/copy/hexdigest)
+    """
+    params = {"model": model}
 
     # Only include non-None parameters
     if temperature is not None:
-        request_data["temperature"] = temperature
+        params["temperature"] = temperature
     if max_tokens is not None:
-        request_data["max_tokens"] = max_tokens
+        params["max_tokens"] = max_tokens
     if tools:
-        request_data["tools"] = tools
+        params["tools"] = tools
 
     # Include any additional kwargs
-    for key, value in sorted(kwargs.items()):
+    for key, value in kwargs.items():
         if value is not None:
-            request_data[key] = value
+            params[key] = value
+
+    h = _new_hasher()
+    _canonical_update(h, params)
+    return h
+
+
+def hash_messages(prefix, messages: List[Dict[str, Any]]) -> str:
+    """
+    Finish a cache key from a request_prefix_hasher() state.
+
+    The prefix is copied, not consumed, so it can be reused.
+
+    Returns:
+        Hex digest string (64 characters), equal to hash_request's key
+    """
+    h = prefix.copy()
+    _update_messages(h, messages)
+    return h.hexdigest()
 
-    # Create deterministic JSON string
-    json_str = json.dumps(request_data, sort_keys=True, separators=(",", ":"))
 
-    # Return SHA-256 hash
-    return hashlib.sha256(json_str.encode()).hexdigest()
+def canonical_equal(a: Any, b: Any) -> bool:
+    """
+    Check whether two values hash identically when canonicalized.
+
+    Unlike ==, this tells apart values the key encoding distinguishes,
+    such as 0, 0.0 and False.
+    """
+    if type(a) is not type(b):
+        # Lists and tuples share an encoding
+        return (
+            isinstance(a, (list, tuple))
+            and isinstance(b, (list, tuple))
+            and _sequences_equal(a, b)
+        )
+    if isinstance(a, dict):
+        return len(a) == len(b) and _sequences_equal(
+            sorted(a.items()), sorted(b.items())
+        )
+    if isinstance(a, (list, tuple)):
+        return _sequences_equal(a, b)
+    if isinstance(a, float):
+        # repr, not ==: 0.0 and -0.0 are encoded differently
+        return repr(a) == repr(b)
+    return a == b
+
+
+def _sequences_equal(a, b) -> bool:
+    """canonical_equal for two sequences, item by item."""
+    return len(a) == len(b) and all(map(canonical_equal, a, b))
 
 
 def hash_completion_request(
@@ -89,7 +234,7 @@ def hash_completion_request(
         **kwargs: Additional parameters
 
     Returns:
-        SHA-256 hash string
+        Hex digest string (64 characters)
     """
     request_data = {
         "prompt": prompt,
@@ -105,5 +250,6 @@ def hash_completion_request(
         if value is not None:
             request_data[key] = value
 
-    json_str = json.dumps(request_data, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(json_str.encode()).hexdigest()
+    h = _new_hasher()
+    _canonical_update(h, request_data)
+    return h.hexdigest()
@@ -1,18 +1,20 @@
 """HTTP proxy server for caching LLM API requests."""
 
-import json
-from typing import Optional
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Tuple
 from pathlib import Path
 
 try:
     from flask import Flask, request, jsonify, Response
     import requests
+    from requests.adapters import HTTPAdapter
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
 
+from . import _json
 from .cache import Cache
-from .hasher import hash_request
+from .hasher import canonical_equal, hash_messages, request_prefix_hasher
 
 
 class CacheProxy:
@@ -62,6 +64,18 @@ class CacheProxy:
                 "base_url", "https://api.openai.com/v1"
             )
 
+        # Shared session so upstream TCP/TLS connections are kept alive
+        self._http = requests.Session()
+        # Never store cookies: the session is shared by every proxied client
+        self._http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=128)
+        self._http.mount("https://", adapter)
+        self._http.mount("http://", adapter)
+
+        # (model, temperature, max_tokens, tools) of the last request and a
+        # hasher with those parameters already absorbed
+        self._hash_prefix = None
+
         self.app = Flask(__name__)
         self._setup_routes()
 
@@ -102,41 +116,56 @@ class CacheProxy:
 
         # Don't cache streaming requests
         if data.get("stream", False):
-            return self._forward_request(data)
+            body, status, content_type = self._forward_request(data)
+            return Response(body, status=status, content_type=content_type or "application/json")
 
         # Generate cache key
-        cache_key = hash_request(
-            messages=messages,
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            tools=tools,
-        )
-
-        # Check cache
-        cached = self.cache.get(cache_key)
+        cache_key = self._cache_key(messages, model, temperature, max_tokens, tools)
+
+        # Check cache, serving the stored JSON bytes as-is
+        cached = self.cache.get_raw(cache_key)
         if cached is not None:
             # Add header to indicate cache hit
-            response = jsonify(cached)
+            response = Response(cached, mimetype="application/json")
             response.headers["X-Cache"] = "HIT"
             return response
 
         # Forward to actual API
-        result = self._forward_request(data)
+        body, status, content_type = self._forward_request(data)
+        response = Response(body, status=status, content_type=content_type or "application/json")
 
-        if result.status_code == 200:
-            # Cache successful response
-            response_data = result.get_json()
-            self.cache.set(cache_key, response_data, model)
-
-            response = jsonify(response_data)
+        # Only JSON is cached: get() must be able to decode every entry
+        if status == 200 and _is_json(content_type):
+            # Cache successful response verbatim
+            self.cache.set_raw(cache_key, body, model)
             response.headers["X-Cache"] = "MISS"
-            return response
 
-        return result
+        return response
+
+    def _cache_key(self, messages, model, temperature, max_tokens, tools) -> str:
+        """
+        Compute the same key as hash_request.
+
+        Consecutive requests usually share every parameter but the messages,
+        so the hasher state for those parameters is kept and copied instead
+        of rehashing them each time.
+        """
+        params = (model, temperature, max_tokens, tools)
+        prefix = self._hash_prefix
+        # Type-exact comparison: 0, 0.0 and False are equal but hash differently
+        if prefix is None or not canonical_equal(prefix[0], params):
+            prefix = (params, request_prefix_hasher(*params))
+            self._hash_prefix = prefix
+
+        return hash_messages(prefix[1], messages)
+
+    def _forward_request(self, data: dict) -> Tuple[bytes, int, str]:
+        """
+        Forward request to the actual API.
 
-    def _forward_request(self, data: dict) -> Response:
-        """Forward request to the actual API."""
+        Returns:
+            Tuple of (raw response body, HTTP status code, content type)
+        """
         # Determine target path
         if self.provider == "anthropic":
             path = "/messages"
@@ -155,18 +184,41 @@ class CacheProxy:
             headers["Content-Type"] = "application/json"
 
         try:
-            resp = requests.post(url, json=data, headers=headers, timeout=120)
-            return Response(
-                resp.content,
-                status=resp.status_code,
-                headers={"Content-Type": "application/json"}
-            )
+            resp = self._http.post(url, json=data, headers=headers, timeout=120)
+            return resp.content, resp.status_code, resp.headers.get("Content-Type", "")
         except requests.RequestException as e:
-            return jsonify({"error": str(e)}), 502
+            return _json.dumps({"error": str(e)}), 502, "application/json"
+
+    def run(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        debug: bool = False,
+        threads: int = 32,
+    ):
+        """
+        Run the proxy server.
+
+        Serves with waitress when it is installed, so up to `threads` requests
+        (e.g. MISSes waiting on the upstream API) are handled concurrently.
+        Falls back to Flask's threaded development server otherwise, and
+        always in debug mode.
+        """
+        if not debug:
+            try:
+                from waitress import serve
+            except ImportError:
+                pass
+            else:
+                serve(self.app, host=host, port=port, threads=threads)
+                return
+
+        self.app.run(host=host, port=port, debug=debug, threaded=True)
+
 
-    def run(self, host: str = "127.0.0.1", port: int = 8080, debug: bool = False):
-        """Run the proxy server."""
-        self.app.run(host=host, port=port, debug=debug)
+def _is_json(content_type: str) -> bool:
+    """Whether a Content-Type header names JSON (e.g. with a charset)."""
+    return content_type.split(";", 1)[0].strip().lower() == "application/json"
 
 
 def create_app(
@@ -0,0 +1,323 @@
+"""Tests for the SQLite cache."""
+
+import os
+import sqlite3
+
+import pytest
+
+from llm_cache import Cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = Cache(path=tmp_path / "cache.db")
+    yield c
+    c.close()
+
+
+def _make_baseline_db(path, rows, page_size=4096):
+    """Create a database with the original rowid table and TEXT responses."""
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA page_size = {page_size}")
+    conn.execute("""
+        CREATE TABLE cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            model TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL,
+            hit_count INTEGER DEFAULT 0,
+            last_accessed REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_expires_at ON cache(expires_at)")
+    conn.execute("CREATE INDEX idx_last_accessed ON cache(last_accessed)")
+    conn.execute("CREATE TABLE stats (key TEXT PRIMARY KEY, value INTEGER DEFAULT 0)")
+    conn.execute("INSERT INTO stats (key, value) VALUES ('hits', 3), ('misses', 1)")
+    conn.executemany(
+        "INSERT INTO cache VALUES (?, ?, 'gpt-4', ?, NULL, 2, ?)",
+        [(key, response, at, at) for key, response, at in rows],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_size_includes_wal(cache):
+    for i in range(200):
+        cache.set(f"k{i}", {"content": "x" * 1000}, "gpt-4")
+
+    s = cache.stats()
+
+    wal = cache.path.with_name(cache.path.name + "-wal")
+    expected = cache.path.stat().st_size
+    if wal.exists():
+        expected += wal.stat().st_size
+    assert s["size_bytes"] == expected
+    assert s["size_bytes"] > 200 * 1000
+
+
+def test_init_does_not_keep_a_connection(tmp_path):
+    c = Cache(path=tmp_path / "cache.db")
+    assert getattr(c._local, "conn", None) is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_child_opens_its_own_connection(cache):
+    cache.get("warm")
+    parent_conn = cache._connect()
+
+    pid = os.fork()
+    if pid == 0:
+        ok = cache._connect() is not parent_conn and cache.get("warm") is None
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_set_rejects_missing_model(cache):
+    with pytest.raises(ValueError):
+        cache.set("bad", {"a": 1}, None)
+
+
+def test_failed_background_write_loses_only_its_row(cache):
+    # Make the database reject one row so the batched insert fails
+    cache._connect().execute("""
+        CREATE TRIGGER reject_bad BEFORE INSERT ON cache
+        WHEN NEW.key = 'bad'
+        BEGIN SELECT RAISE(ABORT, 'rejected'); END
+    """)
+
+    for i in range(10):
+        cache.set(f"good{i}", {"i": i}, "gpt-4")
+    cache.set("bad", {"a": 1}, "gpt-4")
+    for i in range(10, 20):
+        cache.set(f"good{i}", {"i": i}, "gpt-4")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        cache.flush()
+    # Reported once
+    cache.flush()
+
+    assert cache.stats()["entries"] == 20
+    assert cache.get("bad") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_forked_child_can_write(cache):
+    # Leaves the parent's writer thread running across the fork
+    cache.set("parent", {"a": 1}, "gpt-4")
+    cache.flush()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            cache.set("child", {"b": 1}, "gpt-4")
+            cache.flush()
+            ok = cache.get("child") == {"b": 1}
+        finally:
+            os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert cache.get("child") == {"b": 1}
+
+
+def test_import_missing_file_keeps_cache(cache, tmp_path):
+    cache.set("key", {"a": 1}, "gpt-4")
+    missing = tmp_path / "missing.db"
+
+    with pytest.raises(FileNotFoundError):
+        cache.import_db(missing)
+
+    assert not missing.exists()
+    assert cache.get("key") == {"a": 1}
+
+
+def test_export_import_round_trip(cache, tmp_path):
+    cache.set("key", {"a": 1}, "gpt-4")
+    exported = tmp_path / "export db.db"
+    cache.export_db(exported)
+    cache.clear()
+
+    cache.import_db(exported)
+    assert cache.get("key") == {"a": 1}
+
+
+def test_memory_layer_invalidated_by_delete(cache):
+    cache.set("key", {"a": 1}, "gpt-4")
+    cache.flush()
+    assert cache.get("key") == {"a": 1}
+    assert "key" in cache._mem
+
+    assert cache.delete("key")
+    assert cache.get("key") is None
+
+
+def test_memory_layer_invalidated_by_clear(cache):
+    cache.set("key", {"a": 1}, "gpt-4")
+    cache.flush()
+    assert cache.get("key") == {"a": 1}
+    assert "key" in cache._mem
+
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_memory_layer_invalidated_by_set(cache):
+    cache.set("key", {"a": 1}, "gpt-4")
+    cache.flush()
+    assert cache.get("key") == {"a": 1}
+    assert "key" in cache._mem
+
+    cache.set("key", {"a": 2}, "gpt-4")
+    assert cache.get("key") == {"a": 2}
+    cache.flush()
+    assert cache.get("key") == {"a": 2}
+
+
+def test_memory_layer_expires_entries(cache, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("llm_cache.cache.time.time", lambda: clock[0])
+
+    cache.set("key", {"a": 1}, "gpt-4", ttl_seconds=10)
+    cache.flush()
+    assert cache.get("key") == {"a": 1}
+    assert "key" in cache._mem
+
+    clock[0] += 11
+    assert cache.get("key") is None
+    assert "key" not in cache._mem
+
+
+@pytest.mark.parametrize("drop", ["delete", "clear", "set"])
+def test_row_read_before_a_drop_is_not_kept_in_memory(cache, drop):
+    cache.set("key", {"a": 1}, "gpt-4")
+    cache.flush()
+
+    # Run the drop in the gap between the SQLite read and the memory insert
+    record = cache._record
+
+    def record_then_drop(hit, key=None, now=None):
+        record(hit, key, now)
+        if hit and key is None:
+            cache._record = record
+            if drop == "delete":
+                cache.delete("key")
+            elif drop == "clear":
+                cache.clear()
+            else:
+                cache.set("key", {"a": 2}, "gpt-4")
+                cache.flush()
+
+    cache._record = record_then_drop
+    assert cache.get("key") == {"a": 1}
+
+    assert "key" not in cache._mem
+    assert cache.get("key") == ({"a": 2} if drop == "set" else None)
+
+
+def test_import_database_with_other_page_size(cache, tmp_path):
+    source = tmp_path / "large-pages.db"
+    _make_baseline_db(source, [("key", '{"a": 1}', 1.0)], page_size=8192)
+    cache.set("other", {"b": 1}, "gpt-4")
+
+    cache.import_db(source)
+
+    assert cache.get("key") == {"a": 1}
+    assert cache.get("other") is None
+    assert cache._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_baseline_database_is_migrated(tmp_path):
+    path = tmp_path / "cache.db"
+    _make_baseline_db(
+        path, [("old", '{"a": 1}', 1.0), ("new", '{"b": [2, "x"]}', 2.0)]
+    )
+
+    cache = Cache(path=path)
+    try:
+        conn = cache._connect()
+        (sql,) = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+        ).fetchone()
+        assert "WITHOUT ROWID" in sql.upper()
+        indexes = {
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = 'cache' AND sql IS NOT NULL"
+            )
+        }
+        assert indexes == {"idx_expires_at", "idx_last_accessed"}
+        assert conn.execute(
+            "SELECT key, hit_count, created_at FROM cache ORDER BY key"
+        ).fetchall() == [("new", 2, 2.0), ("old", 2, 1.0)]
+
+        assert cache.get("old") == {"a": 1}
+        assert cache.get("new") == {"b": [2, "x"]}
+        assert cache.stats()["hits"] == 5
+    finally:
+        cache.close()
+
+
+def test_import_migrates_baseline_export(cache, tmp_path):
+    source = tmp_path / "export.db"
+    _make_baseline_db(source, [("key", '{"a": 1}', 1.0)])
+
+    cache.import_db(source)
+
+    (sql,) = cache._connect().execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'cache'"
+    ).fetchone()
+    assert "WITHOUT ROWID" in sql.upper()
+    assert cache.get("key") == {"a": 1}
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("llm_cache.cache.time.time", lambda: clock[0])
+    # Evicts once 16 writes have accumulated (the minimum batch)
+    cache = Cache(path=tmp_path / "cache.db", max_entries=12)
+    try:
+        for i in range(10):
+            clock[0] = 100.0 + i
+            cache.set(f"k{i}", {"i": i}, "gpt-4")
+        cache.flush()
+
+        # k1 is read into memory but then goes cold
+        clock[0] = 100.5
+        assert cache.get("k1") == {"i": 1}
+        # k0 is kept hot by a memory hit alone, which SQLite hasn't seen yet
+        clock[0] = 100.2
+        assert cache.get("k0") == {"i": 0}
+        clock[0] = 111.0
+        assert cache.get("k0") == {"i": 0}
+        assert "k0" in cache._mem and "k1" in cache._mem
+
+        for i in range(6):
+            clock[0] = 120.0 + i
+            cache.set(f"n{i}", {"i": i}, "gpt-4")
+        cache.flush()
+
+        on_disk = {
+            key for (key,) in cache._connect().execute("SELECT key FROM cache")
+        }
+        assert on_disk == {"k0", "k5", "k6", "k7", "k8", "k9"} | {
+            f"n{i}" for i in range(6)
+        }
+        assert "k1" not in cache._mem
+        assert cache.get("k1") is None
+        assert cache.get("k0") == {"i": 0}
+    finally:
+        cache.close()
+
+
+def test_close_unregisters_exit_flush(tmp_path, monkeypatch):
+    unregistered = []
+    monkeypatch.setattr("llm_cache.cache.atexit.unregister", unregistered.append)
+
+    cache = Cache(path=tmp_path / "cache.db")
+    cache.close()
+
+    assert unregistered == [cache._atexit]
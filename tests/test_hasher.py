@@ -0,0 +1,28 @@
+"""Tests for cache key hashing."""
+
+import pytest
+
+from llm_cache import hash_request
+from llm_cache.hasher import canonical_equal
+
+
+def test_key_is_stable():
+    # Keys must not depend on optional packages, or shared caches never hit
+    key = hash_request(
+        [{"role": "user", "content": "Hello"}], model="gpt-4", temperature=0.7
+    )
+    assert key == "f271d52cafe9d2c31271897b634d81ef72d2066b6654543a9596bdfaf2e5bbc7"
+
+
+def test_canonical_equal_is_type_exact():
+    assert canonical_equal({"a": [1, "x"]}, {"a": (1, "x")})
+    assert not canonical_equal(0, 0.0)
+    assert not canonical_equal(1, True)
+    assert not canonical_equal(0.0, -0.0)
+    assert not canonical_equal({"a": 1}, {"a": 1.0})
+
+
+@pytest.mark.parametrize("message", ["hello", None, [("role", "user")]])
+def test_non_dict_message_is_rejected(message):
+    with pytest.raises(TypeError):
+        hash_request([message], model="gpt-4")
@@ -0,0 +1,43 @@
+"""Tests for the JSON encoding helpers."""
+
+import json
+
+import pytest
+
+from llm_cache import Cache, _json
+
+
+VALUES = [
+    {"a": [1, 2.5, None, True], "s": "héllo"},
+    {1: "x", None: "y", True: "z"},
+    {"big": 2**70, "neg": -(2**64)},
+    {"nan": float("nan"), "inf": [float("-inf")]},
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_backends_encode_alike(value):
+    assert _json.dumps(value) == _json._stdlib_dumps(value)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_round_trip_matches_stdlib(value):
+    expected = json.loads(_json._stdlib_dumps(value))
+    assert _json.loads(_json.dumps(value)) == expected
+
+
+def test_reads_nan_written_by_stdlib():
+    value = _json.loads(json.dumps({"n": float("nan")}).encode())
+    assert value["n"] != value["n"]
+
+
+def test_set_accepts_what_json_accepts(tmp_path):
+    cache = Cache(path=tmp_path / "cache.db")
+    try:
+        cache.set("ints", {1: "x"}, "gpt-4")
+        cache.set("big", {"big": 2**70}, "gpt-4")
+        cache.flush()
+        assert cache.get("ints") == {"1": "x"}
+        assert cache.get("big") == {"big": 2**70}
+    finally:
+        cache.close()
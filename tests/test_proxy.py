@@ -0,0 +1,112 @@
+"""Tests for the caching proxy."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("requests")
+
+from llm_cache import Cache, hash_request  # noqa: E402
+from llm_cache.proxy import CacheProxy  # noqa: E402
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    """Minimal chat completions API that sets a cookie on every reply."""
+
+    received = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.received.append(
+            {"authorization": self.headers.get("Authorization"),
+             "cookie": self.headers.get("Cookie")}
+        )
+        content = body["messages"][-1]["content"]
+        if content == "maintenance":
+            payload, content_type = b"<html>maintenance</html>", "text/html"
+        else:
+            payload = json.dumps({"echo": content}).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Set-Cookie", f"__cf_bm={self.headers.get('Authorization')}; Path=/")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _Upstream.received = []
+    server = HTTPServer(("127.0.0.1", 0), _Upstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", _Upstream.received
+    server.shutdown()
+
+
+@pytest.fixture
+def proxy(tmp_path, upstream):
+    url, _ = upstream
+    p = CacheProxy(cache=Cache(path=tmp_path / "cache.db"), target_url=url)
+    yield p
+    p.cache.close()
+
+
+def _chat(client, content, token):
+    return client.post(
+        "/v1/chat/completions",
+        json={"model": "gpt-4", "messages": [{"role": "user", "content": content}]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_upstream_cookies_not_shared_between_clients(proxy, upstream):
+    _, received = upstream
+    client = proxy.app.test_client()
+
+    assert _chat(client, "one", "A").status_code == 200
+    assert _chat(client, "two", "B").status_code == 200
+
+    assert received[1]["authorization"] == "Bearer B"
+    assert received[1]["cookie"] is None
+
+
+def test_non_json_upstream_body_not_cached(proxy, upstream):
+    _, received = upstream
+    client = proxy.app.test_client()
+
+    for _ in range(2):
+        resp = _chat(client, "maintenance", "A")
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/html"
+        assert "X-Cache" not in resp.headers
+
+    assert len(received) == 2
+    assert proxy.cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize(
+    "sequence",
+    [
+        [0, 0.0, False, 0, -0.0, 0.0],
+        [1, 1.0, True, None, 1],
+        [0.7, 0.7, 0.70000001],
+    ],
+)
+def test_cache_key_matches_hash_request(proxy, sequence):
+    messages = [{"role": "user", "content": "hi"}]
+    for temperature in sequence:
+        for max_tokens, tools in [(None, None), (1, [{"n": 1}]), (1.0, [{"n": 1.0}])]:
+            expected = hash_request(
+                messages, "gpt-4", temperature=temperature,
+                max_tokens=max_tokens, tools=tools,
+            )
+            key = proxy._cache_key(messages, "gpt-4", temperature, max_tokens, tools)
+            assert key == expected, (temperature, max_tokens, tools)